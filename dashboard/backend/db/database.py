@@ -1,28 +1,130 @@
 """
 Database connection and session management for the dashboard.
 """
+import asyncio
+import logging
 import os
+import re
+from collections import OrderedDict
 from pathlib import Path
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import AsyncIterator
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .types import json_dumps
+
+logger = logging.getLogger(__name__)
 
 # Default database path
 DEFAULT_DB_PATH = Path.home() / ".continuous-claude" / "state" / "swarm.db"
 DB_PATH = os.environ.get("SWARM_DB_PATH", str(DEFAULT_DB_PATH))
 
+# Warm read-only connections kept for dashboard queries, plus the burst
+# allowance used when concurrent pollers exhaust them
+READ_POOL_SIZE = int(os.environ.get("SWARM_DB_READ_POOL_SIZE", 8))
+READ_POOL_OVERFLOW = int(os.environ.get("SWARM_DB_READ_POOL_OVERFLOW", 8))
+
+# Rows fetched per round trip when streaming large results
+STREAM_CHUNK_SIZE = 256
+
+# Per-session log databases live next to the main database. With an
+# in-memory main database they are kept in memory too.
+SESSIONS_DIR = None if DB_PATH == ":memory:" else Path(DB_PATH).parent / "sessions"
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+# Maximum number of per-session log engines kept open
+LOG_ENGINE_CACHE_SIZE = 32
+
+# Stored in PRAGMA user_version once the schema is in place. Bump it whenever
+# tables or indexes change so existing databases pick up the new DDL.
+SCHEMA_VERSION = 1
+
 # Ensure directory exists
 Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
 
-# Create async engine
-engine = create_async_engine(
+# Connection-level tuning applied to every new SQLite connection.
+SQLITE_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Writer-only tuning. WAL lets dashboard reads proceed while agents write.
+# page_size only takes effect on an empty database, so it must precede WAL.
+SQLITE_WRITE_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+# Reader-only tuning. Dashboard polling is read-heavy, so map up to 1 GiB of
+# the database to serve pages without a read() syscall each.
+SQLITE_READ_PRAGMAS = (
+    "PRAGMA mmap_size=1073741824",
+)
+
+# Writer engine: SQLite allows a single writer, so keep exactly one connection
+write_engine = create_async_engine(
     f"sqlite+aiosqlite:///{DB_PATH}",
     echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=1,
+    max_overflow=0,
     connect_args={"check_same_thread": False},
 )
 
-# Session factory
-async_session_maker = async_sessionmaker(
-    engine,
+# Reader engine: read-only connections that stay open for the app lifetime.
+# An in-memory database is private to its connection, so reuse the writer.
+if DB_PATH == ":memory:":
+    read_engine = write_engine
+else:
+    read_engine = create_async_engine(
+        f"sqlite+aiosqlite:///file:{DB_PATH}?mode=ro&uri=true",
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_POOL_OVERFLOW,
+        connect_args={"check_same_thread": False},
+    )
+
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    """Run a sequence of PRAGMA statements on a raw connection."""
+    if DB_PATH == ":memory:":
+        return
+
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+@event.listens_for(write_engine.sync_engine, "connect")
+def _set_write_pragmas(dbapi_connection, connection_record):
+    """Apply SQLite pragmas to each new writer connection."""
+    _apply_pragmas(dbapi_connection, SQLITE_WRITE_PRAGMAS + SQLITE_PRAGMAS)
+
+
+if read_engine is not write_engine:
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _set_read_pragmas(dbapi_connection, connection_record):
+        """Apply SQLite pragmas to each new reader connection."""
+        _apply_pragmas(dbapi_connection, SQLITE_PRAGMAS + SQLITE_READ_PRAGMAS)
+
+
+# Session factories
+write_session_maker = async_sessionmaker(
+    write_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+read_session_maker = async_sessionmaker(
+    read_engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
@@ -30,19 +132,189 @@ async_session_maker = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# Base class for models stored in per-session log databases
+LogBase = declarative_base()
+
+# Open per-session log engines, least recently used first
+_log_engines: OrderedDict[str, AsyncEngine] = OrderedDict()
+_log_engines_lock = asyncio.Lock()
+
+
+async def get_write_session() -> AsyncSession:
+    """Dependency for getting read-write database sessions."""
+    async with write_session_maker() as session:
+        yield session
+
 
-async def get_session() -> AsyncSession:
-    """Dependency for getting database sessions."""
-    async with async_session_maker() as session:
+async def get_read_session() -> AsyncSession:
+    """Dependency for getting read-only database sessions."""
+    async with read_session_maker() as session:
         yield session
 
 
+def _ensure_schema(sync_conn, metadata):
+    """Create missing tables and indexes unless the schema version is current."""
+    version = sync_conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if version == SCHEMA_VERSION:
+        return
+
+    metadata.create_all(sync_conn)
+    # create_all skips indexes on tables that predate them
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    sync_conn.exec_driver_sql(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+async def stream_json_rows(query, session_maker=read_session_maker) -> AsyncIterator[bytes]:
+    """Stream query rows as a JSON array, fetching them in chunks."""
+    async with session_maker() as session:
+        result = await session.stream(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        separator = b"["
+        async for rows in result.mappings().partitions():
+            yield separator + b",".join(json_dumps(dict(row)) for row in rows)
+            separator = b","
+        yield b"]" if separator == b"," else b"[]"
+
+
+def logs_db_path(session_id: str) -> Path | None:
+    """Return the log database path for a session, or None when kept in memory."""
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    if SESSIONS_DIR is None:
+        return None
+    return SESSIONS_DIR / session_id / "logs.db"
+
+
+async def get_log_engine(session_id: str, create: bool = False) -> AsyncEngine | None:
+    """Return the engine for a session's log database.
+
+    Returns None when the database does not exist and create is False.
+    """
+    path = logs_db_path(session_id)
+
+    async with _log_engines_lock:
+        engine = _log_engines.get(session_id)
+        if engine is not None:
+            _log_engines.move_to_end(session_id)
+            return engine
+
+        if path is None or not path.exists():
+            if not create:
+                return None
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+
+        # An in-memory database is private to its connection, so keep just one
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path or ':memory:'}",
+            echo=False,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=1,
+            max_overflow=4 if path is not None else 0,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(engine.sync_engine, "connect", _set_write_pragmas)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(_ensure_schema, LogBase.metadata)
+
+        _log_engines[session_id] = engine
+        # In-memory log databases only live as long as their engine
+        while SESSIONS_DIR is not None and len(_log_engines) > LOG_ENGINE_CACHE_SIZE:
+            _, evicted = _log_engines.popitem(last=False)
+            await evicted.dispose()
+
+        return engine
+
+
+async def drop_session_logs(session_id: str):
+    """Close and delete a session's log database."""
+    path = logs_db_path(session_id)
+
+    async with _log_engines_lock:
+        engine = _log_engines.pop(session_id, None)
+        if engine is not None:
+            await engine.dispose()
+
+    if path is None:
+        return
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+    if path.parent.exists() and not any(path.parent.iterdir()):
+        path.parent.rmdir()
+
+
+async def _migrate_legacy_logs():
+    """Move log entries from the main database into per-session log databases.
+
+    Entries keep their ids and are inserted with OR IGNORE, so an interrupted
+    migration can simply run again.
+    """
+    async with write_engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'log_entries'"
+        )
+        if result.first() is None:
+            return
+        result = await conn.exec_driver_sql("SELECT DISTINCT session_id FROM log_entries")
+        session_ids = result.scalars().all()
+
+    for session_id in session_ids:
+        try:
+            engine = await get_log_engine(session_id, create=True)
+        except ValueError:
+            logger.warning("Dropping legacy log entries for invalid session id %r", session_id)
+            continue
+
+        # Values are copied verbatim; both databases use the same encodings
+        async with write_engine.connect() as conn:
+            result = await conn.stream(
+                text(
+                    "SELECT id, session_id, agent_id, level, message, data, created_at"
+                    " FROM log_entries WHERE session_id = :session_id"
+                ).execution_options(yield_per=STREAM_CHUNK_SIZE),
+                {"session_id": session_id},
+            )
+            async for rows in result.partitions():
+                async with engine.begin() as log_conn:
+                    await log_conn.exec_driver_sql(
+                        "INSERT OR IGNORE INTO log_entries"
+                        " (id, session_id, agent_id, level, message, data, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [tuple(row) for row in rows],
+                    )
+
+    async with write_engine.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE log_entries")
+
+
 async def init_db():
-    """Initialize database tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Initialize database tables and indexes."""
+    async with write_engine.connect() as conn:
+        version = (await conn.exec_driver_sql("PRAGMA user_version")).scalar()
+    if version == SCHEMA_VERSION:
+        return
+
+    # Databases from before the versioned schema kept logs in the main file
+    await _migrate_legacy_logs()
+
+    async with write_engine.begin() as conn:
+        await conn.run_sync(_ensure_schema, Base.metadata)
+
+
+async def optimize_db():
+    """Refresh query planner statistics."""
+    async with write_engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA optimize")
 
 
 async def close_db():
     """Close database connections."""
-    await engine.dispose()
+    async with _log_engines_lock:
+        while _log_engines:
+            _, engine = _log_engines.popitem()
+            await engine.dispose()
+    if read_engine is not write_engine:
+        await read_engine.dispose()
+    await write_engine.dispose()
@@ -1,10 +1,14 @@
 """
 SQLAlchemy ORM models for the dashboard database.
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
-from .database import Base
+from .database import Base, LogBase
+from .types import FastJSON
+
+# Current UTC time evaluated by SQLite inside the INSERT/UPDATE statement.
+# Padded to microseconds so it sorts alongside Python-written timestamps.
+UTC_NOW = func.strftime("%Y-%m-%d %H:%M:%f000", "now")
 
 
 class Session(Base):
@@ -12,21 +16,24 @@ class Session(Base):
     __tablename__ = "sessions"
 
     id = Column(String, primary_key=True)
-    started_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, default=UTC_NOW)
     prompt = Column(Text, nullable=False)
     total_cost = Column(Float, default=0.0)
     status = Column(String, default="running")  # running, completed, failed
 
     # Relationships
-    agents = relationship("Agent", back_populates="session", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="session", cascade="all, delete-orphan")
-    messages = relationship("Message", back_populates="session", cascade="all, delete-orphan")
-    pull_requests = relationship("PullRequest", back_populates="session", cascade="all, delete-orphan")
+    agents = relationship("Agent", back_populates="session", cascade="all, delete-orphan", lazy="raise")
+    tasks = relationship("Task", back_populates="session", cascade="all, delete-orphan", lazy="raise")
+    messages = relationship("Message", back_populates="session", cascade="all, delete-orphan", lazy="raise")
+    pull_requests = relationship("PullRequest", back_populates="session", cascade="all, delete-orphan", lazy="raise")
 
 
 class Agent(Base):
     """Agent state and information."""
     __tablename__ = "agents"
+    __table_args__ = (
+        Index("ix_agents_session_created", "session_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True)
     session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
@@ -37,17 +44,21 @@ class Agent(Base):
     cost = Column(Float, default=0.0)
     worktree = Column(String, nullable=True)
     last_activity = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=UTC_NOW)
 
     # Relationships
-    session = relationship("Session", back_populates="agents")
-    tasks = relationship("Task", back_populates="agent")
-    pull_requests = relationship("PullRequest", back_populates="agent")
+    session = relationship("Session", back_populates="agents", lazy="raise")
+    tasks = relationship("Task", back_populates="agent", lazy="raise")
+    pull_requests = relationship("PullRequest", back_populates="agent", lazy="raise")
 
 
 class Task(Base):
     """Task queue items."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_session_status_prio_created", "session_id", "status", text("priority DESC"), "created_at"),
+        Index("ix_tasks_pending", text("priority DESC"), "created_at", sqlite_where=text("status = 'pending'")),
+    )
 
     id = Column(String, primary_key=True)
     session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
@@ -55,20 +66,24 @@ class Task(Base):
     type = Column(String, nullable=False)
     status = Column(String, default="pending")  # pending, in_progress, completed, failed
     priority = Column(Integer, default=5)
-    payload = Column(JSON, nullable=True)
-    result = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    payload = Column(FastJSON, nullable=True)
+    result = Column(FastJSON, nullable=True)
+    created_at = Column(DateTime, default=UTC_NOW)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
     # Relationships
-    session = relationship("Session", back_populates="tasks")
-    agent = relationship("Agent", back_populates="tasks")
+    session = relationship("Session", back_populates="tasks", lazy="raise")
+    agent = relationship("Agent", back_populates="tasks", lazy="raise")
 
 
 class Message(Base):
     """Inter-agent messages."""
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_session_created", "session_id", "created_at"),
+        Index("ix_messages_unread", "session_id", sqlite_where=text("read = 0")),
+    )
 
     id = Column(String, primary_key=True)
     session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
@@ -76,12 +91,12 @@ class Message(Base):
     to_agent = Column(String, nullable=False)
     type = Column(String, nullable=False)
     subject = Column(String, nullable=True)
-    body = Column(JSON, nullable=True)
+    body = Column(FastJSON, nullable=True)
     read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=UTC_NOW)
 
     # Relationships
-    session = relationship("Session", back_populates="messages")
+    session = relationship("Session", back_populates="messages", lazy="raise")
 
 
 class FailureInsight(Base):
@@ -99,13 +114,16 @@ class FailureInsight(Base):
     confidence = Column(Float, default=0.5)
     times_applied = Column(Integer, default=0)
     times_successful = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=UTC_NOW)
+    updated_at = Column(DateTime, default=UTC_NOW, onupdate=UTC_NOW)
 
 
 class PullRequest(Base):
     """Pull request tracking."""
     __tablename__ = "pull_requests"
+    __table_args__ = (
+        Index("ix_prs_session", "session_id"),
+    )
 
     id = Column(String, primary_key=True)
     session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
@@ -114,22 +132,45 @@ class PullRequest(Base):
     title = Column(String, nullable=True)
     status = Column(String, nullable=True)  # open, merged, closed
     branch = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=UTC_NOW)
     merged_at = Column(DateTime, nullable=True)
 
     # Relationships
-    session = relationship("Session", back_populates="pull_requests")
-    agent = relationship("Agent", back_populates="pull_requests")
+    session = relationship("Session", back_populates="pull_requests", lazy="raise")
+    agent = relationship("Agent", back_populates="pull_requests", lazy="raise")
 
 
-class LogEntry(Base):
-    """Real-time log entries for streaming."""
+class LogEntry(LogBase):
+    """Real-time log entries for streaming, stored per session."""
     __tablename__ = "log_entries"
+    __table_args__ = (
+        Index("ix_logs_session_created", "session_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
+    session_id = Column(String, nullable=False)
     agent_id = Column(String, nullable=True)
     level = Column(String, default="info")  # info, warning, error, debug
     message = Column(Text, nullable=False)
-    data = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    data = Column(FastJSON, nullable=True)
+    created_at = Column(DateTime, default=UTC_NOW)
+
+
+# Columns selected for read endpoints that serialize rows directly
+SESSION_COLUMNS = (Session.id, Session.started_at, Session.prompt, Session.total_cost, Session.status)
+AGENT_COLUMNS = (
+    Agent.id, Agent.persona, Agent.status, Agent.current_task,
+    Agent.iteration, Agent.cost, Agent.worktree, Agent.last_activity,
+)
+TASK_COLUMNS = (
+    Task.id, Task.type, Task.status, Task.priority, Task.agent_id, Task.payload,
+    Task.result, Task.created_at, Task.started_at, Task.completed_at,
+)
+MESSAGE_COLUMNS = (
+    Message.id, Message.from_agent, Message.to_agent, Message.type,
+    Message.subject, Message.body, Message.read, Message.created_at,
+)
+LOG_COLUMNS = (
+    LogEntry.id, LogEntry.session_id, LogEntry.agent_id, LogEntry.level,
+    LogEntry.message, LogEntry.data, LogEntry.created_at,
+)
@@ -0,0 +1,60 @@
+"""
+Custom column types for the dashboard database.
+"""
+import json
+from datetime import date, datetime
+import orjson
+from sqlalchemy.types import BLOB, TypeDecorator
+
+# Marks values encoded by the stdlib fallback. JSON allows leading whitespace,
+# so the stored value is still plain JSON.
+FALLBACK_PREFIX = b" "
+
+
+def _json_default(obj):
+    """Encode the non-JSON types orjson handles natively."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(value) -> bytes:
+    """Encode a value with the stdlib, matching orjson's compact output."""
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def json_dumps(value) -> bytes:
+    """Encode a value with orjson, falling back to the stdlib for what it rejects.
+
+    orjson refuses integers wider than 64 bits, which the stdlib encodes exactly.
+    """
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(value)
+
+
+class FastJSON(TypeDecorator):
+    """JSON column encoded with orjson and stored as a BLOB.
+
+    Values written as TEXT by the stdlib JSON type are still readable.
+    Values orjson cannot encode are stored via the stdlib with a marker
+    prefix, so they are decoded by the stdlib too and round-trip exactly.
+    """
+    impl = BLOB
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            return FALLBACK_PREFIX + _stdlib_dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str) or value.startswith(FALLBACK_PREFIX):
+            return json.loads(value)
+        return orjson.loads(value)
@@ -0,0 +1,189 @@
+"""
+Background writers that batch high-frequency inserts.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any
+from sqlalchemy import Row, insert, select, update, func
+
+from .database import get_log_engine, write_session_maker
+from .models import LogEntry, Task, TASK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Flush thresholds for buffered log entries
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.1  # seconds
+
+# Flush thresholds for buffered task updates
+TASK_BATCH_SIZE = 200
+TASK_FLUSH_INTERVAL = 0.02  # seconds
+
+
+class BatchWriter(ABC):
+    """Collects queued items and hands them to _flush in batches."""
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[Any] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        """Start the background flush loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush buffered entries and stop the flush loop."""
+        if self._task is None:
+            return
+        self.queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        """Collect entries until the batch is full or the interval elapses."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            entry = await self.queue.get()
+            if entry is None:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._flush(batch)
+
+    @abstractmethod
+    async def _flush(self, batch: list[Any]):
+        """Write one batch of queued items."""
+
+
+class LogWriter(BatchWriter):
+    """Buffers log entries and inserts each batch in a single transaction."""
+
+    def __init__(self, batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL):
+        super().__init__(batch_size, flush_interval)
+
+    def put(self, entry: dict[str, Any]):
+        """Queue a log entry for the next batch."""
+        self.queue.put_nowait(entry)
+
+    async def _flush(self, batch: list[dict[str, Any]]):
+        """Insert a batch of log entries with one commit per session database."""
+        by_session: dict[str, list[dict[str, Any]]] = {}
+        for entry in batch:
+            by_session.setdefault(entry["session_id"], []).append(entry)
+
+        for session_id, entries in by_session.items():
+            try:
+                engine = await get_log_engine(session_id, create=True)
+                async with engine.begin() as conn:
+                    await conn.execute(insert(LogEntry), entries)
+            except Exception:
+                logger.exception("Failed to write %d log entries for %s", len(entries), session_id)
+                await self._flush_each(session_id, entries)
+
+    async def _flush_each(self, session_id: str, entries: list[dict[str, Any]]):
+        """Insert entries one at a time so a bad entry does not drop the rest."""
+        try:
+            engine = await get_log_engine(session_id, create=True)
+        except Exception:
+            return
+
+        for entry in entries:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(LogEntry), entry)
+            except Exception:
+                logger.exception("Dropped log entry for %s", session_id)
+
+
+# Columns returned for an updated task. Plain rows rather than ORM objects,
+# so updates to the same task in one batch each see their own state.
+TASK_UPDATE_COLUMNS = (*TASK_COLUMNS, Task.session_id)
+
+
+def task_update_stmt(task_id: str, changes: dict[str, Any]):
+    """Build a statement that applies changes to a task and returns its row."""
+    if not changes:
+        return select(*TASK_UPDATE_COLUMNS).where(Task.id == task_id)
+
+    values = dict(changes)
+
+    # Stamp status transitions, keeping the first timestamp
+    status = values.get("status")
+    if status == "in_progress":
+        values["started_at"] = func.coalesce(Task.started_at, datetime.utcnow())
+    elif status in ("completed", "failed"):
+        values["completed_at"] = func.coalesce(Task.completed_at, datetime.utcnow())
+
+    return update(Task).where(Task.id == task_id).values(**values).returning(*TASK_UPDATE_COLUMNS)
+
+
+class TaskWriter(BatchWriter):
+    """Buffers task updates and applies each batch with a single commit."""
+
+    def __init__(self, batch_size: int = TASK_BATCH_SIZE, flush_interval: float = TASK_FLUSH_INTERVAL):
+        super().__init__(batch_size, flush_interval)
+
+    def put(self, task_id: str, changes: dict[str, Any]) -> asyncio.Future:
+        """Queue a task update; the future resolves to the updated task row or None."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((task_id, changes, future))
+        return future
+
+    async def _flush(self, batch: list[tuple[str, dict[str, Any], asyncio.Future]]):
+        """Apply a batch of task updates in one transaction.
+
+        If the batch fails, its updates are retried one at a time so only the
+        failing update's caller sees the error.
+        """
+        try:
+            tasks = await self._apply(batch)
+        except Exception as exc:
+            if len(batch) > 1:
+                logger.exception("Failed to apply %d task updates; retrying individually", len(batch))
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.exception("Failed to apply task update for %s", batch[0][0])
+            future = batch[0][2]
+            if not future.done():
+                future.set_exception(exc)
+            return
+
+        for (_, _, future), task in zip(batch, tasks):
+            if not future.done():
+                future.set_result(task)
+
+    async def _apply(self, batch: list[tuple[str, dict[str, Any], asyncio.Future]]) -> list[Row | None]:
+        """Run the updates in one transaction and return the updated task rows."""
+        async with write_session_maker() as session:
+            tasks = []
+            for task_id, changes, _ in batch:
+                result = await session.execute(task_update_stmt(task_id, changes))
+                tasks.append(result.first())
+            await session.commit()
+        return tasks
+
+
+# Global writer instances
+log_writer = LogWriter()
+task_writer = TaskWriter()
@@ -3,21 +3,64 @@ Continuous Claude Dashboard - FastAPI Backend
 
 Real-time monitoring dashboard for multi-agent swarm orchestration.
 """
+import asyncio
+import logging
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from db.database import init_db, close_db, get_session
-from db.models import Session, Agent, Task, Message, PullRequest, LogEntry
-from models.schemas import (
-    SessionInfo, SessionCreate, DashboardState, Metrics,
-    AgentStatus, TaskInfo, TaskQueue, MessageInfo, LogEntryInfo
+from sqlalchemy import select, insert, func, and_, lambda_stmt
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.database import (
+    init_db, close_db, optimize_db,
+    get_write_session, get_read_session, read_session_maker, stream_json_rows,
+    get_log_engine, logs_db_path, drop_session_logs,
+)
+from db.models import (
+    Session, Agent, Task, Message, PullRequest, LogEntry,
+    SESSION_COLUMNS, AGENT_COLUMNS, TASK_COLUMNS, MESSAGE_COLUMNS, LOG_COLUMNS,
 )
+from db.types import json_dumps
+from db.writers import log_writer, task_writer
+from models.schemas import SessionInfo, SessionCreate, DashboardState, LogEntryInfo
 from routes import agents, tasks, websocket
+from routes.deps import ensure_session, invalidate_session
+
+logger = logging.getLogger(__name__)
+
+# Interval between PRAGMA optimize runs (seconds)
+OPTIMIZE_INTERVAL = 15 * 60
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, or the stdlib for what it rejects."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def session_to_dict(row) -> dict:
+    """Convert a session row mapping to a SessionInfo-shaped dict."""
+    started_at = row["started_at"]
+    return {
+        **row,
+        "elapsed_time": (datetime.utcnow() - started_at).total_seconds() if started_at else 0,
+    }
+
+
+async def periodic_optimize():
+    """Periodically refresh SQLite query planner statistics."""
+    while True:
+        await asyncio.sleep(OPTIMIZE_INTERVAL)
+        try:
+            await optimize_db()
+        except Exception:
+            # Retry on the next interval
+            logger.exception("PRAGMA optimize failed")
 
 
 @asynccontextmanager
@@ -25,8 +68,14 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     await init_db()
+    log_writer.start()
+    task_writer.start()
+    optimize_task = asyncio.create_task(periodic_optimize())
     yield
     # Shutdown
+    optimize_task.cancel()
+    await log_writer.stop()
+    await task_writer.stop()
     await close_db()
 
 
@@ -35,6 +84,7 @@ app = FastAPI(
     description="Real-time monitoring dashboard for multi-agent swarm orchestration",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration
@@ -65,37 +115,25 @@ app.include_router(websocket.router)
 async def list_sessions(
     status: str | None = None,
     limit: int = 10,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """List recent sessions."""
-    query = select(Session)
+    query = lambda_stmt(lambda: select(*SESSION_COLUMNS))
     if status:
-        query = query.where(Session.status == status)
-    query = query.order_by(Session.started_at.desc()).limit(limit)
+        query += lambda q: q.where(Session.status == status)
+    query += lambda q: q.order_by(Session.started_at.desc()).limit(limit)
 
     result = await db.execute(query)
-    sessions = result.scalars().all()
-
-    return [
-        SessionInfo(
-            id=s.id,
-            started_at=s.started_at,
-            prompt=s.prompt,
-            total_cost=s.total_cost,
-            status=s.status,
-            elapsed_time=(datetime.utcnow() - s.started_at).total_seconds() if s.started_at else 0,
-        )
-        for s in sessions
-    ]
+    return ORJSONResponse([session_to_dict(row) for row in result.mappings()])
 
 
 @app.get("/api/sessions/{session_id}", response_model=SessionInfo)
 async def get_session_info(
     session_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get session details."""
-    result = await db.execute(select(Session).where(Session.id == session_id))
+    result = await db.execute(lambda_stmt(lambda: select(Session).where(Session.id == session_id)))
     session = result.scalar_one_or_none()
 
     if not session:
@@ -114,28 +152,18 @@ async def get_session_info(
 @app.post("/api/sessions", response_model=SessionInfo)
 async def create_session(
     session_data: SessionCreate,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Create a new session."""
-    session = Session(
-        id=session_data.id,
-        prompt=session_data.prompt,
-        status=session_data.status,
-        started_at=datetime.utcnow(),
+    result = await db.execute(
+        insert(Session)
+        .values(id=session_data.id, prompt=session_data.prompt, status=session_data.status)
+        .returning(*SESSION_COLUMNS)
     )
-
-    db.add(session)
+    session = dict(result.mappings().one())
     await db.commit()
-    await db.refresh(session)
 
-    return SessionInfo(
-        id=session.id,
-        started_at=session.started_at,
-        prompt=session.prompt,
-        total_cost=session.total_cost,
-        status=session.status,
-        elapsed_time=0,
-    )
+    return ORJSONResponse({**session, "elapsed_time": 0})
 
 
 @app.patch("/api/sessions/{session_id}")
@@ -143,7 +171,7 @@ async def update_session(
     session_id: str,
     status: str | None = None,
     total_cost: float | None = None,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Update session status and cost."""
     result = await db.execute(select(Session).where(Session.id == session_id))
@@ -158,126 +186,207 @@ async def update_session(
         session.total_cost = total_cost
 
     await db.commit()
+    invalidate_session(session_id)
 
-    return {"status": "updated", "session_id": session_id}
+    # Push the change to live dashboards
+    from routes.websocket import emit_cost_updated, emit_session_complete
+    if total_cost is not None:
+        await emit_cost_updated(session_id, session.total_cost, {})
+    if status in ("completed", "failed"):
+        await emit_session_complete(session_id, status, {"total_cost": session.total_cost})
 
+    return {"status": "updated", "session_id": session_id}
 
-# =============================================================================
-# Dashboard State Endpoint
-# =============================================================================
 
-@app.get("/api/dashboard/{session_id}", response_model=DashboardState)
-async def get_dashboard_state(
+@app.delete("/api/sessions/{session_id}")
+async def delete_session(
     session_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
-    """Get complete dashboard state for a session."""
-    # Get session
+    """Delete a session, its related rows and its log database."""
     result = await db.execute(select(Session).where(Session.id == session_id))
     session = result.scalar_one_or_none()
 
+    if session:
+        await db.delete(session)
+        await db.commit()
+        invalidate_session(session_id)
+
+    # Also clears log databases left behind for sessions without a row
+    try:
+        await drop_session_logs(session_id)
+    except ValueError:
+        pass  # Invalid ids never had a log database
+
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Get agents
-    result = await db.execute(
-        select(Agent).where(Agent.session_id == session_id).order_by(Agent.created_at)
-    )
-    agents_list = [AgentStatus.model_validate(a) for a in result.scalars().all()]
+    return {"status": "deleted", "session_id": session_id}
 
-    # Get tasks organized by status
-    result = await db.execute(
-        select(Task).where(Task.session_id == session_id).order_by(Task.priority.desc(), Task.created_at)
-    )
-    all_tasks = result.scalars().all()
-
-    task_queue = TaskQueue()
-    for task in all_tasks:
-        task_info = TaskInfo.model_validate(task)
-        if task.status == "pending":
-            task_queue.pending.append(task_info)
-        elif task.status == "in_progress":
-            task_queue.in_progress.append(task_info)
-        elif task.status == "completed":
-            task_queue.completed.append(task_info)
-        elif task.status == "failed":
-            task_queue.failed.append(task_info)
-
-    # Get recent messages
-    result = await db.execute(
-        select(Message)
-        .where(Message.session_id == session_id)
-        .order_by(Message.created_at.desc())
-        .limit(20)
-    )
-    recent_messages = [MessageInfo.model_validate(m) for m in result.scalars().all()]
 
-    # Count unread messages
-    result = await db.execute(
-        select(func.count(Message.id))
-        .where(Message.session_id == session_id)
-        .where(Message.read == False)
-    )
-    pending_messages = result.scalar() or 0
+# =============================================================================
+# Dashboard State Endpoint
+# =============================================================================
 
-    # Get recent logs
-    result = await db.execute(
-        select(LogEntry)
-        .where(LogEntry.session_id == session_id)
-        .order_by(LogEntry.created_at.desc())
-        .limit(50)
-    )
-    recent_logs = [LogEntryInfo.model_validate(log) for log in result.scalars().all()]
+# Row caps for the task lists rendered by the dashboard
+DASHBOARD_ACTIVE_TASK_LIMIT = 100
+DASHBOARD_FINISHED_TASK_LIMIT = 20
 
-    # Calculate metrics
-    result = await db.execute(
-        select(PullRequest).where(PullRequest.session_id == session_id)
+
+async def fetch_mappings(query):
+    """Run a query on its own read-only session and return rows as dicts."""
+    async with read_session_maker() as db:
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+
+async def fetch_rows(query):
+    """Run a query on its own read-only session and return all rows."""
+    async with read_session_maker() as db:
+        result = await db.execute(query)
+        return result.all()
+
+
+async def fetch_recent_logs(session_id: str, limit: int = 50):
+    """Return the newest log entries from a session's log database."""
+    try:
+        engine = await get_log_engine(session_id)
+    except ValueError:
+        return []
+    if engine is None:
+        return []
+
+    async with AsyncSession(engine) as db:
+        result = await db.execute(lambda_stmt(
+            lambda: select(*LOG_COLUMNS)
+            .where(LogEntry.session_id == session_id)
+            .order_by(LogEntry.created_at.desc())
+            .limit(limit)
+        ))
+        return [dict(row) for row in result.mappings()]
+
+
+@app.get("/api/dashboard/{session_id}", response_model=DashboardState)
+async def get_dashboard_state(session_id: str):
+    """Get complete dashboard state for a session."""
+    # Independent slices run concurrently, each on its own pooled reader.
+    # Single-value counters ride along on the session row so one dashboard
+    # poll leaves readers free for the others.
+    (
+        session, agent_rows, task_stats, active_tasks, finished_tasks,
+        message_rows, log_rows,
+    ) = await asyncio.gather(
+        fetch_mappings(lambda_stmt(
+            lambda: select(
+                *SESSION_COLUMNS,
+                select(func.count())
+                .select_from(Message)
+                .where(Message.session_id == session_id)
+                .where(Message.read == False)
+                .scalar_subquery()
+                .label("pending_messages"),
+                select(func.count(PullRequest.id))
+                .where(PullRequest.session_id == session_id)
+                .scalar_subquery()
+                .label("total_prs"),
+                select(func.count(PullRequest.id))
+                .where(PullRequest.session_id == session_id)
+                .where(PullRequest.status == "merged")
+                .scalar_subquery()
+                .label("merged_prs"),
+                select(func.count(PullRequest.id))
+                .where(PullRequest.session_id == session_id)
+                .where(and_(PullRequest.status == "closed", PullRequest.merged_at.is_(None)))
+                .scalar_subquery()
+                .label("failed_prs"),
+            )
+            .where(Session.id == session_id)
+        )),
+        fetch_mappings(lambda_stmt(
+            lambda: select(*AGENT_COLUMNS).where(Agent.session_id == session_id).order_by(Agent.created_at)
+        )),
+        fetch_rows(lambda_stmt(
+            lambda: select(
+                Task.status,
+                func.count(Task.id),
+                func.avg((func.julianday(Task.completed_at) - func.julianday(Task.started_at)) * 86400),
+            )
+            .where(Task.session_id == session_id)
+            .group_by(Task.status)
+        )),
+        fetch_mappings(lambda_stmt(
+            lambda: select(*TASK_COLUMNS)
+            .where(Task.session_id == session_id)
+            .where(Task.status.in_(("pending", "in_progress")))
+            .order_by(Task.priority.desc(), Task.created_at)
+            .limit(DASHBOARD_ACTIVE_TASK_LIMIT)
+        )),
+        fetch_mappings(lambda_stmt(
+            lambda: select(*TASK_COLUMNS)
+            .where(Task.session_id == session_id)
+            .where(Task.status.in_(("completed", "failed")))
+            .order_by(Task.completed_at.desc())
+            .limit(DASHBOARD_FINISHED_TASK_LIMIT)
+        )),
+        fetch_mappings(lambda_stmt(
+            lambda: select(*MESSAGE_COLUMNS)
+            .where(Message.session_id == session_id)
+            .order_by(Message.created_at.desc())
+            .limit(20)
+        )),
+        fetch_recent_logs(session_id),
     )
-    prs = result.scalars().all()
-    total_prs = len(prs)
-    merged_prs = sum(1 for pr in prs if pr.status == "merged")
-    failed_prs = sum(1 for pr in prs if pr.status == "closed" and pr.merged_at is None)
 
-    completed_tasks = [t for t in all_tasks if t.status == "completed"]
-    failed_tasks = [t for t in all_tasks if t.status == "failed"]
-    total_tasks = len(completed_tasks) + len(failed_tasks)
-    success_rate = len(completed_tasks) / total_tasks if total_tasks > 0 else 0
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    session = session[0]
+    pending_messages = session.pop("pending_messages")
+    total_prs = session.pop("total_prs")
+    merged_prs = session.pop("merged_prs")
+    failed_prs = session.pop("failed_prs")
+    session = session_to_dict(session)
+
+    # Organize tasks by status
+    task_queue = {"pending": [], "in_progress": [], "completed": [], "failed": []}
+    for task in (*active_tasks, *finished_tasks):
+        bucket = task_queue.get(task["status"])
+        if bucket is not None:
+            bucket.append(task)
 
-    # Calculate average iteration time
+    # Calculate metrics
+    # Single pass over the per-status aggregates
+    completed_count = failed_count = 0
     avg_time = 0
-    if completed_tasks:
-        times = [
-            (t.completed_at - t.started_at).total_seconds()
-            for t in completed_tasks
-            if t.started_at and t.completed_at
-        ]
-        avg_time = sum(times) / len(times) if times else 0
-
-    metrics = Metrics(
-        success_rate=success_rate,
-        avg_iteration_time=avg_time,
-        total_prs=total_prs,
-        merged_prs=merged_prs,
-        failed_prs=failed_prs,
-        total_cost=session.total_cost,
-    )
+    for status, count, status_avg in task_stats:
+        if status == "completed":
+            completed_count = count
+            # Average iteration time of completed tasks
+            avg_time = status_avg or 0
+        elif status == "failed":
+            failed_count = count
+
+    total_tasks = completed_count + failed_count
+    success_rate = completed_count / total_tasks if total_tasks > 0 else 0
+
+    metrics = {
+        "success_rate": success_rate,
+        "avg_iteration_time": avg_time,
+        "total_prs": total_prs,
+        "merged_prs": merged_prs,
+        "failed_prs": failed_prs,
+        "total_cost": session["total_cost"],
+    }
 
-    return DashboardState(
-        session=SessionInfo(
-            id=session.id,
-            started_at=session.started_at,
-            prompt=session.prompt,
-            total_cost=session.total_cost,
-            status=session.status,
-            elapsed_time=(datetime.utcnow() - session.started_at).total_seconds() if session.started_at else 0,
-        ),
-        agents=agents_list,
-        tasks=task_queue,
-        recent_messages=recent_messages,
-        pending_messages=pending_messages,
-        metrics=metrics,
-        recent_logs=recent_logs,
-    )
+    # Let pollers reuse a response for up to a second
+    return ORJSONResponse({
+        "session": session,
+        "agents": agent_rows,
+        "tasks": task_queue,
+        "recent_messages": message_rows,
+        "pending_messages": pending_messages,
+        "metrics": metrics,
+        "recent_logs": log_rows,
+    }, headers={"Cache-Control": "max-age=1"})
 
 
 # =============================================================================
@@ -290,10 +399,16 @@ async def get_logs(
     agent_id: str | None = None,
     level: str | None = None,
     limit: int = 100,
-    db: AsyncSession = Depends(get_session),
 ):
     """Get log entries for a session."""
-    query = select(LogEntry).where(LogEntry.session_id == session_id)
+    try:
+        engine = await get_log_engine(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid session id")
+    if engine is None:
+        return []
+
+    query = select(*LOG_COLUMNS).where(LogEntry.session_id == session_id)
 
     if agent_id:
         query = query.where(LogEntry.agent_id == agent_id)
@@ -302,8 +417,10 @@ async def get_logs(
 
     query = query.order_by(LogEntry.created_at.desc()).limit(limit)
 
-    result = await db.execute(query)
-    return [LogEntryInfo.model_validate(log) for log in result.scalars().all()]
+    return StreamingResponse(
+        stream_json_rows(query, async_sessionmaker(engine)),
+        media_type="application/json",
+    )
 
 
 @app.post("/api/logs")
@@ -313,20 +430,26 @@ async def create_log_entry(
     message: str,
     agent_id: str | None = None,
     data: dict | None = None,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Create a log entry."""
-    log_entry = LogEntry(
-        session_id=session_id,
-        agent_id=agent_id,
-        level=level,
-        message=message,
-        data=data,
-        created_at=datetime.utcnow(),
-    )
-
-    db.add(log_entry)
-    await db.commit()
+    try:
+        logs_db_path(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid session id")
+
+    # Log databases are only created for known sessions, so each can be deleted
+    await ensure_session(session_id, db)
+
+    # Buffered and written in batches by the background log writer
+    log_writer.put({
+        "session_id": session_id,
+        "agent_id": agent_id,
+        "level": level,
+        "message": message,
+        "data": data,
+        "created_at": datetime.utcnow(),
+    })
 
     # Emit WebSocket event
     from routes.websocket import emit_log_entry
@@ -366,4 +489,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=int(os.environ.get("PORT", 8000)),
         reload=True,
+        # Compress event frames; batched log and cost payloads repeat keys
+        ws_per_message_deflate=True,
+        # Protocol-level keepalive pings replace the old JSON ping action
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
     )
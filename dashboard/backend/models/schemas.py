@@ -3,7 +3,7 @@ Pydantic schemas for API request/response validation.
 """
 from datetime import datetime
 from typing import Optional, Any
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # =============================================================================
@@ -96,10 +96,10 @@ class TaskUpdate(BaseModel):
 
 
 class TaskQueue(BaseModel):
-    pending: list[TaskInfo] = []
-    in_progress: list[TaskInfo] = []
-    completed: list[TaskInfo] = []
-    failed: list[TaskInfo] = []
+    pending: list[TaskInfo] = Field(default_factory=list)
+    in_progress: list[TaskInfo] = Field(default_factory=list)
+    completed: list[TaskInfo] = Field(default_factory=list)
+    failed: list[TaskInfo] = Field(default_factory=list)
 
 
 # =============================================================================
@@ -220,12 +220,12 @@ class Metrics(BaseModel):
 
 class DashboardState(BaseModel):
     session: Optional[SessionInfo] = None
-    agents: list[AgentStatus] = []
-    tasks: TaskQueue = TaskQueue()
-    recent_messages: list[MessageInfo] = []
+    agents: list[AgentStatus] = Field(default_factory=list)
+    tasks: TaskQueue = Field(default_factory=TaskQueue)
+    recent_messages: list[MessageInfo] = Field(default_factory=list)
     pending_messages: int = 0
-    metrics: Metrics = Metrics()
-    recent_logs: list[LogEntryInfo] = []
+    metrics: Metrics = Field(default_factory=Metrics)
+    recent_logs: list[LogEntryInfo] = Field(default_factory=list)
 
 
 # =============================================================================
@@ -235,7 +235,7 @@ class DashboardState(BaseModel):
 class WebSocketEvent(BaseModel):
     event: str
     data: dict[str, Any]
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
 class AgentStatusEvent(BaseModel):
@@ -3,12 +3,14 @@ Agent management API routes.
 """
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, func, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.database import get_session
-from db.models import Agent, Session
+from db.database import get_write_session, get_read_session
+from db.models import Agent
 from models.schemas import AgentStatus, AgentCreate, AgentUpdate
+from routes.deps import ensure_session
+from routes.websocket import manager, emit_agent_created, emit_agent_status_changed
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -16,7 +18,7 @@ router = APIRouter(prefix="/agents", tags=["agents"])
 @router.get("", response_model=list[AgentStatus])
 async def list_agents(
     session_id: str | None = None,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """List all agents, optionally filtered by session."""
     query = select(Agent)
@@ -32,10 +34,10 @@ async def list_agents(
 @router.get("/{agent_id}", response_model=AgentStatus)
 async def get_agent(
     agent_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get agent details by ID."""
-    result = await db.execute(select(Agent).where(Agent.id == agent_id))
+    result = await db.execute(lambda_stmt(lambda: select(Agent).where(Agent.id == agent_id)))
     agent = result.scalar_one_or_none()
 
     if not agent:
@@ -47,28 +49,27 @@ async def get_agent(
 @router.post("", response_model=AgentStatus)
 async def create_agent(
     agent_data: AgentCreate,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Create a new agent."""
-    # Check if session exists
-    result = await db.execute(select(Session).where(Session.id == agent_data.session_id))
-    session = result.scalar_one_or_none()
-
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    agent = Agent(
-        id=agent_data.id,
-        session_id=agent_data.session_id,
-        persona=agent_data.persona,
-        status=agent_data.status,
-        worktree=agent_data.worktree,
-        created_at=datetime.utcnow(),
+    await ensure_session(agent_data.session_id, db)
+
+    result = await db.execute(
+        insert(Agent)
+        .values(
+            id=agent_data.id,
+            session_id=agent_data.session_id,
+            persona=agent_data.persona,
+            status=agent_data.status,
+            worktree=agent_data.worktree,
+        )
+        .returning(Agent)
     )
-
-    db.add(agent)
+    agent = result.scalar_one()
     await db.commit()
-    await db.refresh(agent)
+
+    if manager.has_subscribers(agent.session_id):
+        await emit_agent_created(agent.session_id, AgentStatus.model_validate(agent).model_dump(mode="json"))
 
     return agent
 
@@ -77,7 +78,7 @@ async def create_agent(
 async def update_agent(
     agent_id: str,
     update_data: AgentUpdate,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Update agent status and properties."""
     result = await db.execute(select(Agent).where(Agent.id == agent_id))
@@ -95,13 +96,15 @@ async def update_agent(
     await db.commit()
     await db.refresh(agent)
 
+    await emit_agent_status_changed(agent.session_id, agent.id, agent.status, agent.iteration, agent.cost)
+
     return agent
 
 
 @router.delete("/{agent_id}")
 async def delete_agent(
     agent_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Delete an agent."""
     result = await db.execute(select(Agent).where(Agent.id == agent_id))
@@ -119,7 +122,7 @@ async def delete_agent(
 @router.get("/{agent_id}/stats")
 async def get_agent_stats(
     agent_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get agent statistics."""
     result = await db.execute(select(Agent).where(Agent.id == agent_id))
@@ -0,0 +1,32 @@
+"""
+Shared helpers for API route handlers.
+"""
+from cachetools import TTLCache
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Session
+
+# Known sessions by id, so existence checks skip the database
+_session_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+async def ensure_session(session_id: str, db: AsyncSession):
+    """Return the (id, status) row for a session, raising 404 if missing."""
+    if session_id in _session_cache:
+        return _session_cache[session_id]
+
+    result = await db.execute(select(Session.id, Session.status).where(Session.id == session_id))
+    row = result.first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    _session_cache[session_id] = row
+    return row
+
+
+def invalidate_session(session_id: str):
+    """Drop a session from the existence cache."""
+    _session_cache.pop(session_id, None)
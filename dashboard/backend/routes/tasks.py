@@ -1,27 +1,39 @@
 """
 Task queue management API routes.
 """
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, select, insert, delete, exists, literal, bindparam, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.database import get_session
-from db.models import Task, Session
+from db.database import get_write_session, get_read_session, stream_json_rows
+from db.models import Session, Task, TASK_COLUMNS
+from db.types import FastJSON
+from db.writers import task_writer, task_update_stmt
 from models.schemas import TaskInfo, TaskCreate, TaskUpdate, TaskQueue
+from routes.websocket import manager, emit_task_created, emit_task_progress
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Largest page the task list endpoint will return
+TASK_LIST_MAX_LIMIT = 10000
+
+# Maximum number of tasks returned per status by the queue endpoint
+TASK_QUEUE_BUCKET_LIMIT = 100
+
+# Task lookup by id, built once so every request reuses the compiled form
+GET_TASK_STMT = select(Task).where(Task.id == bindparam("task_id"))
+
 
 @router.get("", response_model=list[TaskInfo])
 async def list_tasks(
     session_id: str | None = None,
     status: str | None = None,
     agent_id: str | None = None,
-    db: AsyncSession = Depends(get_session),
+    limit: int = Query(1000, ge=1, le=TASK_LIST_MAX_LIMIT),
 ):
-    """List all tasks with optional filters."""
-    query = select(Task)
+    """List tasks with optional filters, streamed in chunks."""
+    query = select(*TASK_COLUMNS)
 
     if session_id:
         query = query.where(Task.session_id == session_id)
@@ -30,37 +42,44 @@ async def list_tasks(
     if agent_id:
         query = query.where(Task.agent_id == agent_id)
 
-    query = query.order_by(Task.priority.desc(), Task.created_at)
+    query = query.order_by(Task.priority.desc(), Task.created_at).limit(limit)
 
-    result = await db.execute(query)
-    tasks = result.scalars().all()
-    return tasks
+    return StreamingResponse(stream_json_rows(query), media_type="application/json")
 
 
 @router.get("/queue", response_model=TaskQueue)
 async def get_task_queue(
     session_id: str | None = None,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get tasks organized by status."""
-    base_query = select(Task)
+    # Rank tasks within each status so only the top of every bucket is loaded
+    rank = func.row_number().over(
+        partition_by=Task.status,
+        order_by=(Task.priority.desc(), Task.created_at),
+    ).label("rn")
+    ranked_query = select(*TASK_COLUMNS, rank)
     if session_id:
-        base_query = base_query.where(Task.session_id == session_id)
+        ranked_query = ranked_query.where(Task.session_id == session_id)
+    ranked = ranked_query.subquery()
 
-    result = await db.execute(base_query.order_by(Task.priority.desc(), Task.created_at))
-    all_tasks = result.scalars().all()
+    result = await db.execute(
+        select(*(ranked.c[column.key] for column in TASK_COLUMNS))
+        .where(ranked.c.rn <= TASK_QUEUE_BUCKET_LIMIT)
+        .order_by(ranked.c.priority.desc(), ranked.c.created_at)
+    )
 
     queue = TaskQueue()
-    for task in all_tasks:
-        task_info = TaskInfo.model_validate(task)
-        if task.status == "pending":
-            queue.pending.append(task_info)
-        elif task.status == "in_progress":
-            queue.in_progress.append(task_info)
-        elif task.status == "completed":
-            queue.completed.append(task_info)
-        elif task.status == "failed":
-            queue.failed.append(task_info)
+    buckets = {
+        "pending": queue.pending,
+        "in_progress": queue.in_progress,
+        "completed": queue.completed,
+        "failed": queue.failed,
+    }
+    for row in result.mappings():
+        bucket = buckets.get(row["status"])
+        if bucket is not None:
+            bucket.append(TaskInfo.model_construct(**row))
 
     return queue
 
@@ -68,10 +87,10 @@ async def get_task_queue(
 @router.get("/{task_id}", response_model=TaskInfo)
 async def get_task(
     task_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get task details by ID."""
-    result = await db.execute(select(Task).where(Task.id == task_id))
+    result = await db.execute(GET_TASK_STMT, {"task_id": task_id})
     task = result.scalar_one_or_none()
 
     if not task:
@@ -83,30 +102,34 @@ async def get_task(
 @router.post("", response_model=TaskInfo)
 async def create_task(
     task_data: TaskCreate,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Create a new task."""
-    # Check if session exists
-    result = await db.execute(select(Session).where(Session.id == task_data.session_id))
-    session = result.scalar_one_or_none()
+    # Insert only when the session exists; no row comes back otherwise
+    values = select(
+        literal(task_data.id),
+        literal(task_data.session_id),
+        literal(task_data.agent_id, String),
+        literal(task_data.type),
+        literal(task_data.priority),
+        literal(task_data.payload, FastJSON),
+        literal("pending"),
+    ).where(exists().where(Session.id == task_data.session_id))
+
+    result = await db.execute(
+        insert(Task)
+        .from_select(["id", "session_id", "agent_id", "type", "priority", "payload", "status"], values)
+        .returning(Task)
+    )
+    task = result.scalar_one_or_none()
 
-    if not session:
+    if not task:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    task = Task(
-        id=task_data.id,
-        session_id=task_data.session_id,
-        agent_id=task_data.agent_id,
-        type=task_data.type,
-        priority=task_data.priority,
-        payload=task_data.payload,
-        status="pending",
-        created_at=datetime.utcnow(),
-    )
-
-    db.add(task)
     await db.commit()
-    await db.refresh(task)
+
+    if manager.has_subscribers(task.session_id):
+        await emit_task_created(task.session_id, TaskInfo.model_validate(task).model_dump(mode="json"))
 
     return task
 
@@ -115,30 +138,34 @@ async def create_task(
 async def update_task(
     task_id: str,
     update_data: TaskUpdate,
-    db: AsyncSession = Depends(get_session),
+    sync: bool = False,
+    db: AsyncSession = Depends(get_write_session),
 ):
-    """Update task status and properties."""
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    """Update task status and properties.
 
+    Updates are applied in batches by the background task writer unless
+    sync is set, in which case they are written on this request's session.
+    """
     update_dict = update_data.model_dump(exclude_unset=True)
 
-    # Handle status transitions
-    if "status" in update_dict:
-        new_status = update_dict["status"]
-        if new_status == "in_progress" and task.started_at is None:
-            task.started_at = datetime.utcnow()
-        elif new_status in ("completed", "failed") and task.completed_at is None:
-            task.completed_at = datetime.utcnow()
+    if not sync:
+        task = await task_writer.put(task_id, update_dict)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        await emit_task_progress(task.session_id, task.id, task.status)
+
+        return task
 
-    for field, value in update_dict.items():
-        setattr(task, field, value)
+    result = await db.execute(task_update_stmt(task_id, update_dict))
+    task = result.first()
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
 
     await db.commit()
-    await db.refresh(task)
+
+    await emit_task_progress(task.session_id, task.id, task.status)
 
     return task
 
@@ -146,16 +173,14 @@ async def update_task(
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: str,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_write_session),
 ):
     """Delete a task."""
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
+    result = await db.execute(delete(Task).where(Task.id == task_id).returning(Task.id))
 
-    if not task:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    await db.delete(task)
     await db.commit()
 
     return {"status": "deleted", "task_id": task_id}
@@ -164,31 +189,32 @@ async def delete_task(
 @router.get("/stats/summary")
 async def get_task_stats(
     session_id: str | None = None,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Get task queue statistics."""
-    base_query = select(Task)
+    query = select(
+        Task.status,
+        func.count(),
+        func.avg(
+            (func.julianday(Task.completed_at) - func.julianday(Task.started_at)) * 86400
+        ).filter(Task.status == "completed"),
+    ).group_by(Task.status)
     if session_id:
-        base_query = base_query.where(Task.session_id == session_id)
-
-    # Count by status
-    result = await db.execute(base_query)
-    all_tasks = result.scalars().all()
-
-    stats = {
-        "total": len(all_tasks),
-        "pending": sum(1 for t in all_tasks if t.status == "pending"),
-        "in_progress": sum(1 for t in all_tasks if t.status == "in_progress"),
-        "completed": sum(1 for t in all_tasks if t.status == "completed"),
-        "failed": sum(1 for t in all_tasks if t.status == "failed"),
-    }
+        query = query.where(Task.session_id == session_id)
+
+    # One aggregated row per status
+    result = await db.execute(query)
 
-    # Calculate average completion time for completed tasks
-    completed_tasks = [t for t in all_tasks if t.status == "completed" and t.started_at and t.completed_at]
-    if completed_tasks:
-        avg_time = sum((t.completed_at - t.started_at).total_seconds() for t in completed_tasks) / len(completed_tasks)
-        stats["avg_completion_time_seconds"] = avg_time
-    else:
-        stats["avg_completion_time_seconds"] = 0
+    stats = {"total": 0, "pending": 0, "in_progress": 0, "completed": 0, "failed": 0}
+    avg_time = None
+    for status, count, status_avg in result:
+        stats["total"] += count
+        if status in stats:
+            stats[status] = count
+        if status == "completed":
+            avg_time = status_avg
+
+    # Average completion time for completed tasks
+    stats["avg_completion_time_seconds"] = avg_time or 0
 
     return stats
@@ -2,80 +2,121 @@
 WebSocket handler for real-time dashboard updates.
 """
 import asyncio
-import json
+import time
 from datetime import datetime
 from typing import Any
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
+from db.types import json_dumps
+
 router = APIRouter(tags=["websocket"])
 
+# Session events emitted within this window share one WebSocket frame
+EVENT_BATCH_INTERVAL = 0.015  # seconds
+
+# Events emitted within this window share one formatted timestamp
+TIMESTAMP_CACHE_TTL = 0.005  # seconds
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates."""
 
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
-        self.session_connections: dict[str, list[WebSocket]] = {}
+        self.active_connections: set[WebSocket] = set()
+        self.session_connections: dict[str, set[WebSocket]] = {}
+        self._pending: dict[str, list[bytes]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
+        self._ts_cache: tuple[float, str] = (float("-inf"), "")
+
+    def _timestamp(self) -> str:
+        """Return the current UTC time in ISO format, reused for a few ms."""
+        now = time.monotonic()
+        cached_at, iso = self._ts_cache
+        if now - cached_at >= TIMESTAMP_CACHE_TTL:
+            iso = datetime.utcnow().isoformat()
+            self._ts_cache = (now, iso)
+        return iso
 
     async def connect(self, websocket: WebSocket, session_id: str | None = None):
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
         if session_id:
-            if session_id not in self.session_connections:
-                self.session_connections[session_id] = []
-            self.session_connections[session_id].append(websocket)
+            self.session_connections.setdefault(session_id, set()).add(websocket)
 
     def disconnect(self, websocket: WebSocket, session_id: str | None = None):
         """Remove a WebSocket connection."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
 
         if session_id and session_id in self.session_connections:
-            if websocket in self.session_connections[session_id]:
-                self.session_connections[session_id].remove(websocket)
+            self.session_connections[session_id].discard(websocket)
             if not self.session_connections[session_id]:
                 del self.session_connections[session_id]
 
+    @staticmethod
+    async def _send_all(connections: tuple[WebSocket, ...], message: bytes) -> list[WebSocket]:
+        """Send a frame to all connections concurrently and return the failed ones."""
+        results = await asyncio.gather(
+            *(connection.send_bytes(message) for connection in connections),
+            return_exceptions=True,
+        )
+        return [conn for conn, result in zip(connections, results) if isinstance(result, Exception)]
+
     async def broadcast(self, event: str, data: dict[str, Any]):
         """Broadcast event to all connected clients."""
-        message = json.dumps({
+        message = json_dumps({
             "event": event,
             "data": data,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(),
         })
 
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.append(connection)
+        disconnected = await self._send_all(tuple(self.active_connections), message)
 
         # Clean up disconnected clients
         for conn in disconnected:
             self.disconnect(conn)
 
-    async def broadcast_to_session(self, session_id: str, event: str, data: dict[str, Any]):
-        """Broadcast event to clients watching a specific session."""
-        if session_id not in self.session_connections:
-            return
+    def has_subscribers(self, session_id: str) -> bool:
+        """Return whether any client is watching a session."""
+        return session_id in self.session_connections
+
+    def enqueue(self, session_id: str, event: str, data: dict[str, Any]):
+        """Queue a session event for the next batched frame.
 
-        message = json.dumps({
+        Callers check has_subscribers first, before building the event data.
+        """
+        # Encoded now so the flush only joins bytes, shared by every subscriber
+        self._pending.setdefault(session_id, []).append(json_dumps({
             "event": event,
             "data": data,
             "session_id": session_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        })
+            "timestamp": self._timestamp(),
+        }))
+        if session_id not in self._flush_tasks:
+            self._flush_tasks[session_id] = asyncio.create_task(
+                self._flush_after(session_id, EVENT_BATCH_INTERVAL)
+            )
+
+    async def _flush_after(self, session_id: str, delay: float):
+        """Send a session's queued events once the batch window closes."""
+        await asyncio.sleep(delay)
+        await self.flush(session_id)
+
+    async def flush(self, session_id: str):
+        """Send a session's queued events as one {"events": [...]} frame."""
+        task = self._flush_tasks.pop(session_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+        events = self._pending.pop(session_id, None)
+        if not events or session_id not in self.session_connections:
+            return
 
-        disconnected = []
-        for connection in self.session_connections[session_id]:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.append(connection)
+        message = b'{"events":[' + b",".join(events) + b"]}"
+        disconnected = await self._send_all(tuple(self.session_connections[session_id]), message)
 
         # Clean up disconnected clients
         for conn in disconnected:
@@ -92,27 +133,21 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     try:
         while True:
-            # Keep connection alive and handle incoming messages
+            # Only subscription requests arrive here; keepalive uses protocol pings
             data = await websocket.receive_text()
             try:
-                message = json.loads(data)
+                message = orjson.loads(data)
 
                 # Handle subscription requests
                 if message.get("action") == "subscribe" and "session_id" in message:
                     session_id = message["session_id"]
-                    if session_id not in manager.session_connections:
-                        manager.session_connections[session_id] = []
-                    manager.session_connections[session_id].append(websocket)
-                    await websocket.send_text(json.dumps({
+                    manager.session_connections.setdefault(session_id, set()).add(websocket)
+                    await websocket.send_bytes(orjson.dumps({
                         "event": "subscribed",
                         "session_id": session_id,
                     }))
 
-                # Handle ping/pong
-                elif message.get("action") == "ping":
-                    await websocket.send_text(json.dumps({"event": "pong"}))
-
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass  # Ignore invalid JSON
 
     except WebSocketDisconnect:
@@ -124,17 +159,10 @@ async def session_websocket_endpoint(websocket: WebSocket, session_id: str):
     """Session-specific WebSocket endpoint."""
     await manager.connect(websocket, session_id)
     try:
+        # Keepalive uses protocol-level ping/pong frames handled by the server,
+        # so incoming messages are only drained until the client disconnects
         while True:
-            data = await websocket.receive_text()
-            try:
-                message = json.loads(data)
-
-                # Handle ping/pong
-                if message.get("action") == "ping":
-                    await websocket.send_text(json.dumps({"event": "pong"}))
-
-            except json.JSONDecodeError:
-                pass
+            await websocket.receive_text()
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, session_id)
@@ -152,6 +180,9 @@ async def emit_agent_status_changed(
     cost: float | None = None,
 ):
     """Emit agent status change event."""
+    if not manager.has_subscribers(session_id):
+        return
+
     data = {
         "agent_id": agent_id,
         "status": status,
@@ -161,7 +192,23 @@ async def emit_agent_status_changed(
     if cost is not None:
         data["cost"] = cost
 
-    await manager.broadcast_to_session(session_id, "agent.status_changed", data)
+    manager.enqueue(session_id, "agent.status_changed", data)
+
+
+async def emit_agent_created(session_id: str, agent: dict[str, Any]):
+    """Emit agent registration event."""
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "agent.created", agent)
+
+
+async def emit_task_created(session_id: str, task: dict[str, Any]):
+    """Emit task creation event."""
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "task.created", task)
 
 
 async def emit_task_progress(
@@ -171,6 +218,9 @@ async def emit_task_progress(
     progress: float | None = None,
 ):
     """Emit task progress event."""
+    if not manager.has_subscribers(session_id):
+        return
+
     data = {
         "task_id": task_id,
         "status": status,
@@ -178,7 +228,7 @@ async def emit_task_progress(
     if progress is not None:
         data["progress"] = progress
 
-    await manager.broadcast_to_session(session_id, "task.progress_updated", data)
+    manager.enqueue(session_id, "task.progress_updated", data)
 
 
 async def emit_message_sent(
@@ -189,7 +239,10 @@ async def emit_message_sent(
     subject: str | None = None,
 ):
     """Emit message sent event."""
-    await manager.broadcast_to_session(session_id, "message.sent", {
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "message.sent", {
         "from": from_agent,
         "to": to_agent,
         "type": message_type,
@@ -204,7 +257,10 @@ async def emit_pr_event(
     title: str | None = None,
 ):
     """Emit pull request event."""
-    await manager.broadcast_to_session(session_id, f"pr.{event_type}", {
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, f"pr.{event_type}", {
         "pr_number": pr_number,
         "title": title,
     })
@@ -212,7 +268,10 @@ async def emit_pr_event(
 
 async def emit_cost_updated(session_id: str, total_cost: float, agent_costs: dict[str, float]):
     """Emit cost update event."""
-    await manager.broadcast_to_session(session_id, "cost.updated", {
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "cost.updated", {
         "total_cost": total_cost,
         "agent_costs": agent_costs,
     })
@@ -226,18 +285,25 @@ async def emit_log_entry(
     data: dict[str, Any] | None = None,
 ):
     """Emit log entry event."""
-    await manager.broadcast_to_session(session_id, "log.entry", {
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "log.entry", {
         "agent_id": agent_id,
         "level": level,
         "message": message,
         "data": data,
-        "timestamp": datetime.utcnow().isoformat(),
     })
 
 
 async def emit_session_complete(session_id: str, status: str, summary: dict[str, Any]):
     """Emit session completion event."""
-    await manager.broadcast_to_session(session_id, "session.complete", {
+    if not manager.has_subscribers(session_id):
+        return
+
+    manager.enqueue(session_id, "session.complete", {
         "status": status,
         "summary": summary,
     })
+    # Nothing follows a completed session, so send without waiting
+    await manager.flush(session_id)
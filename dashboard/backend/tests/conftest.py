@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the dashboard backend tests.
+"""
+import os
+import tempfile
+
+# The database path is read at import time, so point it at a scratch file
+# before any application module is imported.
+os.environ["SWARM_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "swarm.db")
+
+import httpx
+import pytest
+
+from db.database import init_db, close_db
+from db.writers import log_writer, task_writer
+from main import app
+
+
+@pytest.fixture
+async def client():
+    """HTTP client for the app with the database and background writers running."""
+    await init_db()
+    log_writer.start()
+    task_writer.start()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
+
+    await log_writer.stop()
+    await task_writer.stop()
+    await close_db()
+
+
+@pytest.fixture
+async def session_id(client):
+    """Create a session for the test and return its id."""
+    session_id = f"s-{os.urandom(4).hex()}"
+    response = await client.post("/api/sessions", json={"id": session_id, "prompt": "test"})
+    assert response.status_code == 200
+    return session_id
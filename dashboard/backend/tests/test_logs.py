@@ -0,0 +1,68 @@
+"""
+Tests for per-session log storage.
+"""
+import asyncio
+
+from db.database import SESSIONS_DIR, init_db, write_engine
+
+
+async def get_logs(client, session_id: str, count: int) -> list[dict]:
+    """Fetch a session's logs once the background writer has stored count entries."""
+    for _ in range(50):
+        logs = (await client.get(f"/api/logs/{session_id}")).json()
+        if len(logs) >= count:
+            return logs
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"expected {count} log entries, got {len(logs)}")
+
+
+async def test_log_for_unknown_session_is_rejected(client):
+    response = await client.post("/api/logs", params={"session_id": "ghost", "level": "info", "message": "hi"})
+
+    assert response.status_code == 404
+    assert not (SESSIONS_DIR / "ghost").exists()
+
+
+async def test_delete_session_drops_logs(client, session_id):
+    response = await client.post("/api/logs", params={"session_id": session_id, "level": "info", "message": "hi"})
+    assert response.status_code == 200
+    await get_logs(client, session_id, 1)
+    assert (SESSIONS_DIR / session_id).exists()
+
+    response = await client.delete(f"/api/sessions/{session_id}")
+
+    assert response.status_code == 200
+    assert not (SESSIONS_DIR / session_id).exists()
+
+
+async def test_legacy_logs_are_migrated(client, session_id):
+    # Shape of the log table in the main database before the versioned schema
+    async with write_engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "CREATE TABLE log_entries ("
+            " id INTEGER NOT NULL, session_id VARCHAR NOT NULL, agent_id VARCHAR,"
+            " level VARCHAR, message TEXT NOT NULL, data JSON, created_at DATETIME,"
+            " PRIMARY KEY (id), FOREIGN KEY(session_id) REFERENCES sessions (id))"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO log_entries (id, session_id, agent_id, level, message, data, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (7, session_id, "agent-1", "info", "first", '{"step": 1}', "2024-01-01 12:00:00.000000"),
+                (9, session_id, None, "error", "second", None, "2024-01-01 12:00:01.000000"),
+                (11, "bad/id", None, "info", "orphan", None, "2024-01-01 12:00:02.000000"),
+            ],
+        )
+        await conn.exec_driver_sql("PRAGMA user_version=0")
+
+    await init_db()
+
+    logs = (await client.get(f"/api/logs/{session_id}")).json()
+    assert [(log["id"], log["message"], log["data"]) for log in logs] == [
+        (9, "second", None),
+        (7, "first", {"step": 1}),
+    ]
+
+    async with write_engine.connect() as conn:
+        result = await conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE name = 'log_entries'")
+        assert result.first() is None
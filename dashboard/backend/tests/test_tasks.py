@@ -0,0 +1,78 @@
+"""
+Tests for task update batching.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from db.writers import task_writer
+
+
+async def create_task(client, session_id: str, task_id: str):
+    response = await client.post("/api/tasks", json={"id": task_id, "session_id": session_id, "type": "code"})
+    assert response.status_code == 200
+
+
+async def test_failed_update_does_not_fail_batch(client, session_id):
+    await create_task(client, session_id, f"{session_id}-a")
+    await create_task(client, session_id, f"{session_id}-b")
+
+    # Queued in the same batch window; type is NOT NULL, so the second fails
+    response, failed = await asyncio.gather(
+        client.patch(f"/api/tasks/{session_id}-a", json={"status": "in_progress"}),
+        task_writer.put(f"{session_id}-b", {"type": None}),
+        return_exceptions=True,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert isinstance(failed, IntegrityError)
+
+    task_a = (await client.get(f"/api/tasks/{session_id}-a")).json()
+    task_b = (await client.get(f"/api/tasks/{session_id}-b")).json()
+    assert task_a["status"] == "in_progress"
+    assert task_a["started_at"] is not None
+    assert task_b["type"] == "code"
+
+
+async def test_updates_to_same_task_in_batch_return_own_state(client, session_id):
+    await create_task(client, session_id, f"{session_id}-a")
+
+    started, completed = await asyncio.gather(
+        client.patch(f"/api/tasks/{session_id}-a", json={"status": "in_progress"}),
+        client.patch(f"/api/tasks/{session_id}-a", json={"status": "completed"}),
+    )
+
+    assert started.json()["status"] == "in_progress"
+    assert started.json()["completed_at"] is None
+    assert completed.json()["status"] == "completed"
+    assert completed.json()["completed_at"] is not None
+
+
+async def test_sync_update_bypasses_writer(client, session_id, monkeypatch):
+    await create_task(client, session_id, f"{session_id}-a")
+
+    def fail_put(*args):
+        raise AssertionError("sync updates must not be queued")
+
+    monkeypatch.setattr(task_writer, "put", fail_put)
+
+    response = await client.patch(
+        f"/api/tasks/{session_id}-a",
+        params={"sync": "true"},
+        json={"status": "completed", "result": {"ok": True}},
+    )
+
+    assert response.status_code == 200
+    task = response.json()
+    assert task["status"] == "completed"
+    assert task["result"] == {"ok": True}
+    assert task["completed_at"] is not None
+    assert (await client.get(f"/api/tasks/{session_id}-a")).json()["status"] == "completed"
+
+
+@pytest.mark.parametrize("sync", ["false", "true"])
+async def test_update_missing_task_returns_404(client, sync):
+    response = await client.patch("/api/tasks/missing", params={"sync": sync}, json={"status": "failed"})
+    assert response.status_code == 404
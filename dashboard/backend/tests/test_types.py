@@ -0,0 +1,52 @@
+"""
+Tests for the JSON column type.
+"""
+import pytest
+
+from db.database import write_engine
+from db.types import FALLBACK_PREFIX, FastJSON, json_dumps
+
+
+async def create_task(client, session_id: str, payload):
+    task_id = f"{session_id}-t"
+    response = await client.post(
+        "/api/tasks", json={"id": task_id, "session_id": session_id, "type": "code", "payload": payload}
+    )
+    assert response.status_code == 200
+    return task_id
+
+
+async def stored_payload(task_id: str):
+    async with write_engine.connect() as conn:
+        result = await conn.exec_driver_sql("SELECT payload FROM tasks WHERE id = ?", (task_id,))
+        return result.scalar()
+
+
+async def test_wide_integer_round_trips(client, session_id):
+    payload = {"n": 2**70, "items": [1, -(2**65)]}
+    task_id = await create_task(client, session_id, payload)
+
+    assert await stored_payload(task_id) == FALLBACK_PREFIX + json_dumps(payload)
+    assert (await client.get(f"/api/tasks/{task_id}")).json()["payload"] == payload
+
+
+async def test_legacy_text_value_is_readable(client, session_id):
+    task_id = await create_task(client, session_id, {"a": 1})
+    async with write_engine.begin() as conn:
+        await conn.exec_driver_sql("UPDATE tasks SET payload = ? WHERE id = ?", ('{"a": 2}', task_id))
+
+    assert (await client.get(f"/api/tasks/{task_id}")).json()["payload"] == {"a": 2}
+
+
+async def test_null_round_trips(client, session_id):
+    task_id = await create_task(client, session_id, None)
+
+    assert await stored_payload(task_id) is None
+    assert (await client.get(f"/api/tasks/{task_id}")).json()["payload"] is None
+
+
+@pytest.mark.parametrize("value", [{"n": 1}, {"n": 2**70}])
+def test_column_and_response_encodings_agree(value):
+    stored = FastJSON().process_bind_param(value, None)
+
+    assert stored.removeprefix(FALLBACK_PREFIX) == json_dumps(value)
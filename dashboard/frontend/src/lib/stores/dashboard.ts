@@ -169,6 +169,14 @@ export function addLogEntry(entry: LogEntry): void {
 	logs.update((current) => [entry, ...current.slice(0, 99)]);
 }
 
+export function addAgent(agent: AgentStatus): void {
+	agents.update((current) => [...current.filter((a) => a.id !== agent.id), agent]);
+}
+
+export function addTask(task: TaskInfo): void {
+	tasks.update((current) => ({ ...current, pending: [...current.pending, task] }));
+}
+
 export function updateAgentStatus(agentId: string, update: Partial<AgentStatus>): void {
 	agents.update((current) =>
 		current.map((agent) => (agent.id === agentId ? { ...agent, ...update } : agent))
@@ -203,6 +211,7 @@ export function updateTaskStatus(taskId: string, status: TaskInfo['status']): vo
 // =============================================================================
 
 let ws: WebSocket | null = null;
+const decoder = new TextDecoder();
 
 export function connectWebSocket(id: string): void {
 	if (ws) {
@@ -213,6 +222,8 @@ export function connectWebSocket(id: string): void {
 	const wsUrl = `${protocol}//${window.location.host}/ws/${id}`;
 
 	ws = new WebSocket(wsUrl);
+	// The backend sends events as binary JSON frames
+	ws.binaryType = 'arraybuffer';
 
 	ws.onopen = () => {
 		isConnected.set(true);
@@ -239,8 +250,12 @@ export function connectWebSocket(id: string): void {
 
 	ws.onmessage = (event) => {
 		try {
-			const data = JSON.parse(event.data);
-			handleWebSocketEvent(data);
+			const raw = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+			const data = JSON.parse(raw);
+			// Session events arrive batched as { events: [...] }
+			for (const item of data.events ?? [data]) {
+				handleWebSocketEvent(item);
+			}
 		} catch (err) {
 			console.error('Failed to parse WebSocket message:', err);
 		}
@@ -255,18 +270,31 @@ export function disconnectWebSocket(): void {
 	isConnected.set(false);
 }
 
-function handleWebSocketEvent(event: { event: string; data: Record<string, unknown> }): void {
+function handleWebSocketEvent(event: {
+	event: string;
+	data: Record<string, unknown>;
+	timestamp?: string;
+}): void {
 	switch (event.event) {
 		case 'agent.status_changed':
 			updateAgentStatus(event.data.agent_id as string, event.data as Partial<AgentStatus>);
 			break;
 
+		case 'agent.created':
+			addAgent(event.data as unknown as AgentStatus);
+			break;
+
+		case 'task.created':
+			addTask(event.data as unknown as TaskInfo);
+			break;
+
 		case 'task.progress_updated':
 			updateTaskStatus(event.data.task_id as string, event.data.status as TaskInfo['status']);
 			break;
 
 		case 'log.entry':
-			addLogEntry(event.data as unknown as LogEntry);
+			// Live entries carry their time on the event envelope
+			addLogEntry({ ...event.data, created_at: event.timestamp } as unknown as LogEntry);
 			break;
 
 		case 'cost.updated':
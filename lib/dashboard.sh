@@ -74,6 +74,9 @@ start_dashboard() {
         PYTHONPATH="${DASHBOARD_DIR}/backend" python3 -m uvicorn main:app \
             --host 0.0.0.0 \
             --port "$port" \
+            --ws-per-message-deflate true \
+            --ws-ping-interval 20 \
+            --ws-ping-timeout 20 \
             >> "$DASHBOARD_LOG_FILE" 2>&1
     ) &
 